@@ -23,9 +23,23 @@ import sys
 import platform
 import subprocess
 import argparse
+import atexit
+import functools
+import hashlib
+import json
+import mmap
+import queue
+import shutil
+import threading
+import time
+import uuid
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Mapping, Optional, Tuple
 
-def detect_platform():
+def _detect_platform_impl():
     """
     @brief Detect the current operating system platform.
 
@@ -41,6 +55,46 @@ def detect_platform():
     else:
         return "unknown"
 
+# The host platform cannot change while the script runs, so detect it only once
+_PLATFORM = _detect_platform_impl()
+
+def detect_platform():
+    """
+    @brief Get the current operating system platform.
+
+    @return str The detected platform name ('windows', 'linux', 'macos', or 'unknown')
+    """
+    return _PLATFORM
+
+@functools.lru_cache(maxsize=1)
+def _cpu_count():
+    """
+    @brief Get the number of CPUs this process may run on, queried once and cached.
+
+    @details On Linux the CPU affinity mask is used, which reflects the CPUs actually
+    granted to the process (e.g. on CI runners and in containers), unlike the total
+    host core count.
+
+    @return int Number of usable CPUs
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+def _parallel_args(generator):
+    """
+    @brief Build the `cmake --build` arguments controlling parallel compilation.
+
+    @details Ninja parallelizes on its own, and CMake itself honors the
+    CMAKE_BUILD_PARALLEL_LEVEL environment variable, so no -j is passed in those cases.
+
+    @param generator Optional[str] CMake generator name
+    @return list[str] ["-j", <jobs>] or an empty list
+    """
+    if (generator and generator.startswith("Ninja")) or "CMAKE_BUILD_PARALLEL_LEVEL" in os.environ:
+        return []
+    return ["-j", str(_cpu_count())]
+
 def check_android_prerequisites():
     """
     @brief Check if Android build prerequisites are met.
@@ -83,39 +137,125 @@ def check_qnx_prerequisites():
     print(f"QNX SDP path: {qnx_sdp_home}")
     return True
 
+# Environment variables passed on to Conan, CMake and the compilers
+_ENV_WHITELIST = frozenset({
+    # Common
+    "PATH", "HOME", "USER", "LOGNAME", "LANG", "TERM", "TEMP", "TMP", "TMPDIR",
+    "CC", "CXX", "CFLAGS", "CXXFLAGS", "LDFLAGS", "MAKEFLAGS", "PKG_CONFIG_PATH", "PYTHONPATH",
+    # Toolchains installed outside the standard prefixes
+    "LD_LIBRARY_PATH", "DYLD_LIBRARY_PATH",
+    # Search paths read directly by GCC and Clang (conda, Nix, environment modules)
+    "CPATH", "C_INCLUDE_PATH", "CPLUS_INCLUDE_PATH", "LIBRARY_PATH",
+    # Network access for Conan downloads and recipes fetching sources over git/ssh
+    "HTTP_PROXY", "HTTPS_PROXY", "NO_PROXY", "SSL_CERT_FILE", "SSL_CERT_DIR", "REQUESTS_CA_BUNDLE",
+    "SSH_AUTH_SOCK",
+    # Remote sccache backends (GitHub Actions cache, GCS)
+    "ACTIONS_CACHE_URL", "ACTIONS_RESULTS_URL", "ACTIONS_RUNTIME_TOKEN",
+    "GOOGLE_APPLICATION_CREDENTIALS",
+    # Windows system and MSVC developer prompt
+    "SYSTEMROOT", "SYSTEMDRIVE", "WINDIR", "COMSPEC", "PATHEXT", "USERPROFILE", "APPDATA",
+    "LOCALAPPDATA", "PROGRAMDATA", "PROGRAMFILES", "PROGRAMFILES(X86)", "PROGRAMW6432",
+    "COMMONPROGRAMFILES", "COMMONPROGRAMFILES(X86)", "NUMBER_OF_PROCESSORS",
+    "PROCESSOR_ARCHITECTURE", "INCLUDE", "LIB", "LIBPATH",
+})
+_ENV_PREFIXES = (
+    "CONAN_", "CMAKE_", "CCACHE_", "SCCACHE_", "ANDROID_", "QNX_", "LC_", "XDG_", "GIT_", "AWS_",
+    "VS", "VC", "WINDOWSSDK", "UCRT", "UNIVERSALCRT", "FRAMEWORK",
+)
+
+def _build_env():
+    """
+    @brief Build the environment for child processes.
+
+    @details Only the variables read by Conan, CMake, the compilers and the platform
+    SDKs are passed on, instead of the full (often large) environment of the caller.
+    Names are compared case-insensitively, as on Windows.
+
+    @return dict[str, str] Pruned copy of os.environ
+    """
+    return {
+        key: value
+        for key, value in os.environ.items()
+        if key.upper() in _ENV_WHITELIST or key.upper().startswith(_ENV_PREFIXES)
+    }
+
+def _probe_versions(tools):
+    """
+    @brief Query the versions of several tools concurrently.
+
+    @param tools list[str] Executable names, each invoked with `--version`
+    @return dict[str, Optional[subprocess.CompletedProcess]] Results keyed by tool name,
+            None for tools that are not installed or cannot be run
+    """
+    env = _build_env()
+
+    def probe(tool):
+        try:
+            return subprocess.run(
+                [tool, "--version"], capture_output=True, text=True, env=env
+            )
+        except OSError:
+            # Not installed, or a broken/non-executable entry on PATH
+            return None
+
+    versions = {}
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = {executor.submit(probe, tool): tool for tool in tools}
+        for future in as_completed(futures):
+            versions[futures[future]] = future.result()
+    return versions
+
+def _version_from_output(output):
+    """
+    @brief Extract a version number from the output of `<tool> --version`.
+
+    @param output str Standard output of the tool
+    @return str Last word of the first non-empty line, or "unknown" if there is none
+    """
+    for line in output.splitlines():
+        if line.strip():
+            return line.split()[-1]
+    return "unknown"
+
 def check_prerequisites(target_platform=None):
     """
     @brief Check if build prerequisites are satisfied.
 
     @details Verifies the availability of required tools (Conan, CMake)
-    and platform-specific prerequisites (Android NDK, QNX SDP).
+    and platform-specific prerequisites (Android NDK, QNX SDP), and reports
+    the optional tools (Ninja, ccache, sccache) that speed up the build.
 
     @param target_platform Optional[str] Target platform to check ('android', 'qnx', etc.)
     @return bool True if all prerequisites are met, False otherwise
     """
     print("Checking build prerequisites...")
 
+    # Probe all tools at once instead of paying for each process launch in turn
+    versions = _probe_versions(["conan", "cmake", "ninja", "ccache", "sccache"])
+
     # Check Conan
-    try:
-        result = subprocess.run(["conan", "--version"], capture_output=True, text=True)
-        if result.returncode != 0:
-            print("Error: Conan not installed or not in PATH")
-            return False
-        print(f"Conan version: {result.stdout.strip()}")
-    except FileNotFoundError:
+    if versions["conan"] is None:
         print("Error: Conan not installed")
         return False
+    if versions["conan"].returncode != 0:
+        print("Error: Conan not installed or not in PATH")
+        return False
+    print(f"Conan version: {versions['conan'].stdout.strip()}")
 
     # Check CMake
-    try:
-        result = subprocess.run(["cmake", "--version"], capture_output=True, text=True)
-        if result.returncode != 0:
-            print("Error: CMake not installed or not in PATH")
-            return False
-        print(f"CMake version: {result.stdout.split(' ')[2].strip()}")
-    except FileNotFoundError:
+    if versions["cmake"] is None:
         print("Error: CMake not installed")
         return False
+    if versions["cmake"].returncode != 0:
+        print("Error: CMake not installed or not in PATH")
+        return False
+    print(f"CMake version: {_version_from_output(versions['cmake'].stdout)}")
+
+    # Optional tools that speed up the build
+    for tool in ("ninja", "ccache", "sccache"):
+        result = versions[tool]
+        if result is not None and result.returncode == 0:
+            print(f"{tool} version: {_version_from_output(result.stdout)}")
 
     # Platform-specific checks
     if target_platform == "android":
@@ -128,299 +268,759 @@ def check_prerequisites(target_platform=None):
     print("Prerequisites check completed")
     return True
 
-def build_for_windows(project_root, conan_dir, build_dir, build_type, arch=None, verbose=False):
+def _fast_hash(paths, *data):
+    """
+    @brief Compute a content hash over byte strings and files.
+
+    @details Uses BLAKE2b, which is faster than SHA-256 in software, and memory-maps
+    the files instead of reading them into a buffer first.
+
+    @param paths Iterable[Path] Files whose content is hashed, in order
+    @param data bytes Additional byte strings hashed before the files
+    @return str 32-character hex digest
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for chunk in data:
+        h.update(chunk)
+    for path in paths:
+        with open(path, "rb") as f:
+            # Empty files cannot be memory-mapped and contribute nothing anyway
+            if os.fstat(f.fileno()).st_size == 0:
+                continue
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                h.update(mm)
+    return h.hexdigest()
+
+def _conan_default_profile():
+    """
+    @brief Locate the default Conan profile, which every generated host profile includes.
+
+    @return Path Path of the default profile in CONAN_HOME (it may not exist yet)
+    """
+    return Path(os.environ.get("CONAN_HOME", Path.home() / ".conan2")) / "profiles" / "default"
+
+def _conan_lockfile_path(project_root, conan_dir, profile, conan_args):
     """
-    @brief Build the project for Windows platform.
+    @brief Compute the lockfile path for the current conanfile.txt and host profile.
 
-    @details Installs dependencies using Conan, configures the project with CMake
-    using Visual Studio 2022 generator, and builds the project.
+    @details The lockfile name embeds the profile name and a digest of conanfile.txt,
+    the profiles and the Conan arguments, so editing the dependency list or building
+    for another platform automatically selects a new lockfile instead of reusing one
+    resolved for a different graph.
 
     @param project_root Path Root directory of the project
     @param conan_dir Path Directory for Conan-generated files
-    @param build_dir Path Directory for build output
+    @param profile Path Host profile written by _write_profile()
+    @param conan_args list[str] Profile and configuration arguments shared with `conan install`
+    @return Path Path of the lockfile matching the current inputs
+    """
+    paths = [project_root / "conanfile.txt", profile]
+    if _conan_default_profile().exists():
+        paths.append(_conan_default_profile())
+    digest = _fast_hash(paths, json.dumps(conan_args).encode("utf-8"))
+    return conan_dir / f"conan-{profile.stem}-{digest}.lock"
+
+def _create_conan_lockfile(project_root, conan_dir, profile, conan_args, build_type, verbose=False):
+    """
+    @brief Create the Conan lockfile once and reuse it across build invocations.
+
+    @details Resolving the dependency graph is the slowest part of `conan install`.
+    The graph is computed once with `conan lock create`, using the same profiles and
+    configuration as the installs, and persisted under conan_dir; subsequent installs
+    (other build types) pass `--lockfile` and skip the resolution. Lockfiles generated
+    for the same profile from older inputs are removed.
+
+    @param project_root Path Root directory of the project
+    @param conan_dir Path Directory for Conan-generated files
+    @param profile Path Host profile written by _write_profile()
+    @param conan_args list[str] Profile and configuration arguments shared with `conan install`
     @param build_type str Build type ('Debug', 'Release', 'RelWithDebInfo')
-    @param arch Optional[str] Target architecture ('x86', 'x86_64', 'armv8')
     @param verbose bool Enable verbose output
-    @return bool True if build succeeded, False otherwise
+    @return Optional[Path] Path of the lockfile, or None if it could not be created
     """
-    print(f"Building Windows version... {conan_dir}")
+    lockfile = _conan_lockfile_path(project_root, conan_dir, profile, conan_args)
+    if lockfile.exists():
+        print(f"Reusing Conan lockfile: {lockfile}")
+        return lockfile
 
-    if not arch:
-        arch = "x86_64"
+    for stale in conan_dir.glob(f"conan-{profile.stem}-*.lock"):
+        stale.unlink()
 
-    # Install dependencies using conanfile.txt
     cmd = [
         "conan",
-        "install",
+        "lock",
+        "create",
         ".",
-        "--output-folder",
-        str(conan_dir),
-        "--build",
-        "missing",
-        "-s",
-        "os=Windows",
-        "-s",
-        f"arch={arch}",
-        "-s",
-        "compiler=msvc",
-        "-s",
-        "compiler.version=195",
+        f"--lockfile-out={lockfile}",
+        *conan_args,
         "-s",
-        f"compiler.cppstd=17"
+        f"build_type={build_type}",
+        *(["--verbose"] if verbose else []),
     ]
-    if verbose:
-        cmd.append("--verbose")
 
-    result = subprocess.run(cmd, cwd=project_root)
-    if result.returncode != 0:
-        print("Error: Conan installation failed")
-        return False
+    if _run_streaming(cmd, project_root, _ABORT_MARKERS) != 0:
+        print("Error: Conan lockfile creation failed")
+        return None
 
-    # Configure CMake project
-    cmd = [
-        "cmake",
-        "-S",
-        ".",
-        "-B",
-        "build",
-        "-G",
-        "Visual Studio 18 2026",
-        f"-DCMAKE_TOOLCHAIN_FILE={conan_dir}/build/generators/conan_toolchain.cmake",
-        f"-DCMAKE_PREFIX_PATH={conan_dir}",
-        f"-DCMAKE_BUILD_TYPE={build_type}"
+    print(f"Created Conan lockfile: {lockfile}")
+    return lockfile
+
+def _write_profile(path, settings):
+    """
+    @brief Write a Conan host profile with the given settings.
+
+    @details The profile includes the default profile and overrides the given settings,
+    which matches passing them as `-s` flags. The file is only rewritten when its
+    content changes, so Conan sees a stable profile across builds.
+
+    @param path Path Profile file to write
+    @param settings dict[str, str] Conan settings, e.g. {"os": "Linux"}
+    @return Path Path of the profile
+    """
+    lines = ["include(default)", "", "[settings]"]
+    lines.extend(f"{key}={value}" for key, value in settings.items())
+    content = "\n".join(lines) + "\n"
+
+    if not path.exists() or path.read_text() != content:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+    return path
+
+def _conan_profile_args(profile):
+    """
+    @brief Build the `conan install` arguments selecting the host and build profiles.
+
+    @details The host uses the given profile file; the build machine uses the default
+    profile. Test requirements of dependencies (tools.graph:skip_test) are not
+    expanded, which shrinks the graph Conan has to resolve. Tool requirements are
+    kept, because `--build missing` needs them to build packages from source.
+
+    @param profile Path Host profile written by _write_profile()
+    @return list[str] Profile and configuration arguments for `conan install`
+    """
+    return [
+        "-pr:h",
+        str(profile),
+        "-pr:b",
+        "default",
+        "-c",
+        "tools.graph:skip_test=True",
+    ]
+
+def _detect_launcher(prefer_sccache=False):
+    """
+    @brief Detect a compiler cache usable as CMake compiler launcher.
+
+    @param prefer_sccache bool Look for sccache before ccache (used for MSVC builds)
+    @return Optional[str] Name of the detected launcher ('ccache' or 'sccache'), or None
+    """
+    candidates = ["sccache", "ccache"] if prefer_sccache else ["ccache", "sccache"]
+    for candidate in candidates:
+        if shutil.which(candidate):
+            return candidate
+    return None
+
+def _launcher_args(launcher):
+    """
+    @brief Build the CMake arguments that route compilation through a compiler cache.
+
+    @param launcher Optional[str] Launcher returned by _detect_launcher()
+    @return list[str] CMake cache definitions, empty if no launcher is available
+    """
+    if not launcher:
+        return []
+    return [
+        f"-DCMAKE_C_COMPILER_LAUNCHER={launcher}",
+        f"-DCMAKE_CXX_COMPILER_LAUNCHER={launcher}",
     ]
-    if arch == "x86":
-        cmd.extend(["-A", "Win32"])
-    elif arch == "x86_64":
-        cmd.extend(["-A", "x64"])
-    elif arch == "armv8":
-        cmd.extend(["-A", "ARM64"])
-
-    if verbose:
-        cmd.append("--verbose")
-
-    result = subprocess.run(cmd, cwd=project_root)
-    if result.returncode != 0:
-        print("Error: CMake configuration failed")
-        return False
 
-    # Build project
-    cmd = ["cmake", "--build", "build", "--config", build_type]
-    if verbose:
-        cmd.append("--verbose")
+# Line prefixes of fatal Conan/CMake errors; the Conan and configure steps are
+# aborted when a line starts with one. Matching only at the start of the line keeps
+# compiler and test output of dependencies built by `--build missing` from aborting.
+_ABORT_MARKERS = ("ERROR:", "CMake Error")
+# Output still passed on after an abort marker, so the error explanation that follows
+# the marker line is not lost
+_ABORT_CONTEXT_LINES = 50
+_ABORT_GRACE_SECONDS = 2.0
 
-    result = subprocess.run(cmd, cwd=project_root)
-    if result.returncode != 0:
-        print("Error: Build failed")
+def _run_streaming(cmd, cwd, abort_on=(), echo=None):
+    """
+    @brief Run a command and process its output line by line while it runs.
+
+    @details The combined stdout/stderr is passed to echo as it is produced. Once a
+    line starts with one of the abort markers, up to _ABORT_CONTEXT_LINES further lines
+    are passed on for at most _ABORT_GRACE_SECONDS, and then the process is killed,
+    so a failing step is reported quickly instead of after it has finished all
+    remaining work.
+
+    @param cmd list[str] Command line to execute
+    @param cwd Path Working directory
+    @param abort_on Sequence[str] Output markers that abort the command (default: none)
+    @param echo Optional[Callable[[str], Any]] Receives every output line (default: stdout,
+                flushed per line so piped CI logs stay live)
+    @return int Return code of the command (non-zero if it was aborted)
+    """
+    if echo is None:
+        def echo(line):
+            sys.stdout.write(line)
+            sys.stdout.flush()
+    try:
+        proc = subprocess.Popen(
+            cmd,
+            cwd=cwd,
+            env=_build_env(),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            bufsize=1,
+            text=True,
+            errors="replace",
+        )
+    except FileNotFoundError:
+        echo(f"Command not found: {cmd[0]}\n")
+        return 127
+
+    # Read in a separate thread, so waiting for the lines after an abort marker is
+    # bounded even if child processes of the tool keep the pipe open
+    lines = queue.Queue()
+
+    def pump():
+        with proc.stdout:
+            for line in proc.stdout:
+                lines.put(line)
+        lines.put(None)
+
+    threading.Thread(target=pump, daemon=True).start()
+
+    deadline = None
+    remaining = 0
+    while True:
+        try:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            line = lines.get(timeout=timeout)
+        except queue.Empty:
+            break
+        if line is None:
+            break
+        echo(line)
+        if deadline is not None:
+            remaining -= 1
+            if remaining == 0:
+                break
+        elif abort_on and line.startswith(tuple(abort_on)):
+            deadline = time.monotonic() + _ABORT_GRACE_SECONDS
+            remaining = _ABORT_CONTEXT_LINES
+
+    aborted = deadline is not None
+    if aborted and proc.poll() is None:
+        proc.kill()
+    return proc.wait() or int(aborted)
+
+def _run_buffered(cmd, cwd, abort_on=()):
+    """
+    @brief Run a command and capture its combined stdout/stderr.
+
+    @param cmd list[str] Command line to execute
+    @param cwd Path Working directory
+    @param abort_on Sequence[str] Output markers that abort the command (default: none)
+    @return subprocess.CompletedProcess Finished process with the output in stdout
+    """
+    lines = []
+    returncode = _run_streaming(cmd, cwd, abort_on, lines.append)
+    return subprocess.CompletedProcess(cmd, returncode, "".join(lines))
+
+def _check_capabilities(probe, generator=None):
+    """
+    @brief Check the result of a `cmake -E capabilities` probe.
+
+    @param probe subprocess.CompletedProcess Result of the probe
+    @param generator Optional[str] CMake generator that the configure step will use
+    @return bool True if CMake is usable and supports the generator, False otherwise
+    """
+    if probe.returncode != 0:
+        print("Error: CMake capability probe failed")
         return False
 
+    if generator:
+        generators = [g["name"] for g in json.loads(probe.stdout).get("generators", [])]
+        if generator not in generators:
+            print(f"Error: CMake generator not supported: {generator}")
+            return False
+
     return True
 
-def build_for_linux(project_root, conan_dir, build_dir, build_type, arch=None, verbose=False):
+# A build step: cmd is a command line or a callable returning bool, deps are task names,
+# abort_on are the output markers that abort a command line early
+Task = namedtuple("Task", "name cmd cwd deps abort_on", defaults=((),))
+
+def _run_tasks(tasks):
     """
-    @brief Build the project for Linux platform.
+    @brief Run build steps as a dependency graph.
 
-    @details Installs dependencies using Conan, configures the project with CMake
-    using Unix Makefiles generator, and builds the project with parallel compilation.
+    @details Every task starts as soon as all of its dependencies have succeeded, so
+    independent steps overlap while dependent ones keep their order. A task whose
+    dependency failed or was skipped is skipped as well. Tasks must be listed after
+    their dependencies, and task names must be unique.
 
-    @param project_root Path Root directory of the project
-    @param conan_dir Path Directory for Conan-generated files
-    @param build_dir Path Directory for build output
-    @param build_type str Build type ('Debug', 'Release', 'RelWithDebInfo')
-    @param arch Optional[str] Target architecture ('x86', 'x86_64', 'armv7', 'armv8')
-    @param verbose bool Enable verbose output
-    @return bool True if build succeeded, False otherwise
+    @param tasks list[Task] Tasks in dependency order
+    @return dict[str, Optional[int]] Return code per task name, None for skipped tasks
+    @throws ValueError If two tasks share a name or a dependency is not listed earlier
+    """
+    names = set()
+    for task in tasks:
+        if task.name in names:
+            raise ValueError(f"Duplicate task name: {task.name}")
+        missing = [dep for dep in task.deps if dep not in names]
+        if missing:
+            raise ValueError(f"Task {task.name} depends on unknown task(s): {', '.join(missing)}")
+        names.add(task.name)
+
+    futures = {}
+
+    def run(task):
+        for dep in task.deps:
+            if futures[dep].result() != 0:
+                return None
+        if callable(task.cmd):
+            return 0 if task.cmd() else 1
+        return _run_streaming(task.cmd, task.cwd, task.abort_on)
+
+    with ThreadPoolExecutor(max_workers=len(tasks)) as executor:
+        for task in tasks:
+            futures[task.name] = executor.submit(run, task)
+        return {name: future.result() for name, future in futures.items()}
+
+def _conan_install_cmds(cmd, build_types):
     """
-    print("Building Linux version...")
+    @brief Expand a `conan install` command line into one command per build type.
 
-    if not arch:
-        arch = "x86_64"
+    @details All installs share the lockfile, and every install after the first one
+    passes `--lockfile-partial`, so Conan reuses the graph resolved for the first
+    build type instead of computing it again.
 
-    # Install dependencies using conanfile.txt
-    cmd = [
-        "conan",
-        "install",
-        ".",
-        "--output-folder",
-        str(conan_dir),
-        "--build",
-        "missing",
-        "-s",
-        "os=Linux",
-        "-s",
-        f"arch={arch}",
-        "-s",
-        "compiler=gcc",
-        "-s",
-        "compiler.version=11",
-        "-s",
-        f"compiler.cppstd=17",
-    ]
-    if verbose:
-        cmd.append("--verbose")
+    @param cmd list[str] `conan install` command line without a build_type setting
+    @param build_types list[str] Build types ('Debug', 'Release', 'RelWithDebInfo')
+    @return list[list[str]] One command line per build type
+    """
+    cmds = []
+    for index, build_type in enumerate(build_types):
+        cmds.append([
+            *cmd,
+            "-s",
+            f"build_type={build_type}",
+            *(["--lockfile-partial"] if index > 0 else []),
+        ])
+    return cmds
+
+def _build_type_args(generator, build_types):
+    """
+    @brief Build the CMake arguments selecting the configurations to generate.
 
-    result = subprocess.run(cmd, cwd=project_root)
-    if result.returncode != 0:
-        print("Error: Conan installation failed")
-        return False
+    @param generator Optional[str] CMake generator name
+    @param build_types list[str] Build types ('Debug', 'Release', 'RelWithDebInfo')
+    @return list[str] CMAKE_CONFIGURATION_TYPES for multi-configuration generators,
+            CMAKE_BUILD_TYPE otherwise
+    """
+    if _is_multi_config(generator):
+        return [f"-DCMAKE_CONFIGURATION_TYPES={';'.join(build_types)}"]
+    return [f"-DCMAKE_BUILD_TYPE={build_types[0]}"]
 
-    # Configure CMake project
-    cmd = [
-        "cmake",
-        "-S",
-        ".",
-        "-B",
-        "build",
-        f"-DCMAKE_BUILD_TYPE={build_type}",
-        f"-DCMAKE_PREFIX_PATH={conan_dir}",
-        f"-DCMAKE_TOOLCHAIN_FILE={conan_dir}/build/generators/conan_toolchain.cmake"
-    ]
+def _select_generator(default=None):
+    """
+    @brief Select the CMake generator, preferring Ninja when it is installed.
 
-    # Set cross-compilation toolchain (if non-x86_64 architecture is specified)
-    if arch != "x86_64":
-        if arch == "x86":
-            cmd.extend(["-DCMAKE_C_FLAGS=-m32", "-DCMAKE_CXX_FLAGS=-m32"])
-        elif arch == "armv7":
-            cmd.extend(["-DCMAKE_TOOLCHAIN_FILE=cmake/arm-linux-gnueabihf.cmake"])
-        elif arch == "armv8":
-            cmd.extend(["-DCMAKE_TOOLCHAIN_FILE=cmake/aarch64-linux-gnu.cmake"])
-
-    if verbose:
-        cmd.append("--verbose")
-
-    result = subprocess.run(cmd, cwd=project_root)
-    if result.returncode != 0:
-        print("Error: CMake configuration failed")
-        return False
+    @details Ninja Multi-Config is used even for a single build type, so the binary
+    directory and the Conan toolchain location stay the same whatever build types a
+    run requests; switching between "Ninja" and "Ninja Multi-Config" in one build
+    tree is rejected by CMake.
 
-    # Build project
-    import multiprocessing
-    jobs = multiprocessing.cpu_count()
-    cmd = ["cmake", "--build", "build", "-j", str(jobs)]
-    if verbose:
-        cmd.append("--verbose")
+    @param default Optional[str] Generator to use when Ninja is not available
+    @return Optional[str] Generator name, or default if Ninja is not available
+    """
+    if shutil.which("ninja"):
+        return "Ninja Multi-Config"
+    return default
 
-    result = subprocess.run(cmd, cwd=project_root)
-    if result.returncode != 0:
-        print("Error: Build failed")
+def _is_multi_config(generator):
+    """
+    @brief Check whether a CMake generator supports multiple configurations.
+
+    @param generator Optional[str] CMake generator name (None for the platform default)
+    @return bool True for Visual Studio, Xcode and Ninja Multi-Config generators
+    """
+    if not generator:
         return False
+    return generator.startswith(("Visual Studio", "Xcode")) or generator == "Ninja Multi-Config"
 
-    return True
+def _conan_toolchain(conan_dir, generator, build_type):
+    """
+    @brief Locate the toolchain file generated by Conan's cmake_layout.
 
-def build_for_android(project_root, conan_dir, build_dir, build_type, arch=None, verbose=False):
+    @details cmake_layout puts the generators of single-configuration generators
+    into a per-build-type folder, and those of multi-configuration generators into
+    a shared one.
+
+    @param conan_dir Path Directory for Conan-generated files
+    @param generator Optional[str] CMake generator name
+    @param build_type str Build type ('Debug', 'Release', 'RelWithDebInfo')
+    @return str Path of conan_toolchain.cmake
+    """
+    if _is_multi_config(generator):
+        return f"{conan_dir}/build/generators/conan_toolchain.cmake"
+    return f"{conan_dir}/build/{build_type}/generators/conan_toolchain.cmake"
+
+def _configure_hash(project_root, cmd):
+    """
+    @brief Compute the fingerprint of a CMake configure step.
+
+    @param project_root Path Root directory of the project
+    @param cmd list[str] CMake configure command line
+    @return str Hex digest over the command line, CMakeLists.txt and conanfile.txt
+    """
+    # --verbose only changes the output, toggling it must not force a reconfigure
+    cmd = [arg for arg in cmd if arg != "--verbose"]
+    return _fast_hash(
+        [project_root / "CMakeLists.txt", project_root / "conanfile.txt"],
+        repr(cmd).encode("utf-8"),
+    )
+
+def _needs_reconfigure(build_dir, cmd_hash):
     """
-    @brief Build the project for Android platform.
+    @brief Check whether the CMake configure step has to be run again.
+
+    @details The configure step is skipped when CMakeCache.txt exists and the stored
+    fingerprint matches. Changes to nested CMakeLists.txt files are still picked up,
+    because `cmake --build` re-runs the configure step on its own when they change.
+
+    @param build_dir Path CMake binary directory
+    @param cmd_hash str Fingerprint returned by _configure_hash()
+    @return bool True if CMake must be configured, False otherwise
+    """
+    if not (build_dir / "CMakeCache.txt").exists():
+        return True
+
+    sentinel = build_dir / ".configure_hash"
+    if not sentinel.exists():
+        return True
 
-    @details Installs dependencies using Conan with Android settings, configures the project
-    with CMake using Android NDK toolchain, and builds the project for the specified ABI.
+    return sentinel.read_text().strip() != cmd_hash
+
+def _install_hash(project_root, profile, conan_cmds):
+    """
+    @brief Compute the fingerprint of the Conan install step.
 
     @param project_root Path Root directory of the project
+    @param profile Path Host profile used by the installs
+    @param conan_cmds list[list[str]] `conan install` command lines
+    @return str Hex digest over conanfile.txt, the profiles and the command lines
+    """
+    paths = [project_root / "conanfile.txt", profile]
+    if _conan_default_profile().exists():
+        paths.append(_conan_default_profile())
+    cmds = [[arg for arg in cmd if arg != "--verbose"] for cmd in conan_cmds]
+    return _fast_hash(paths, json.dumps(cmds).encode("utf-8"))
+
+def _needs_install(conan_dir, install_hash, toolchain):
+    """
+    @brief Check whether the Conan install step has to be run again.
+
+    @details The install is skipped when the generated toolchain exists and the stored
+    fingerprint matches, since the generators in conan_dir are still valid then.
+
     @param conan_dir Path Directory for Conan-generated files
-    @param build_dir Path Directory for build output
-    @param build_type str Build type ('Debug', 'Release', 'RelWithDebInfo')
-    @param arch Optional[str] Target architecture ('armv7', 'armv8', 'x86', 'x86_64')
-    @param verbose bool Enable verbose output
-    @return bool True if build succeeded, False otherwise
+    @param install_hash str Fingerprint returned by _install_hash()
+    @param toolchain str Path of the conan_toolchain.cmake the configure step uses
+    @return bool True if Conan must install the dependencies, False otherwise
     """
-    print("Building Android version...")
+    if not Path(toolchain).exists():
+        return True
 
-    android_ndk_home = os.environ.get("ANDROID_NDK_HOME")
-    android_build_dir = build_dir / "android"
-    android_build_dir.mkdir(exist_ok=True)
+    sentinel = conan_dir / ".install_fingerprint"
+    if not sentinel.exists():
+        return True
 
-    if not arch:
-        arch = "armv8"
+    return sentinel.read_text().strip() != install_hash
 
-    # Map architecture to Android ABI
-    arch_to_abi = {
-        "armv7": "armeabi-v7a",
-        "armv8": "arm64-v8a",
-        "x86": "x86",
-        "x86_64": "x86_64",
-    }
+def _write_install_hash(conan_dir, install_hash):
+    """
+    @brief Store the fingerprint of a successful Conan install step.
 
-    if arch not in arch_to_abi:
-        print(f"Error: Unsupported Android architecture: {arch}")
-        return False
+    @details The file is replaced atomically, so an interrupted write never leaves a
+    fingerprint that matches a half-finished install.
 
-    android_abi = arch_to_abi[arch]
+    @param conan_dir Path Directory for Conan-generated files
+    @param install_hash str Fingerprint returned by _install_hash()
+    """
+    sentinel = conan_dir / ".install_fingerprint"
+    tmp = sentinel.with_name(sentinel.name + ".tmp")
+    tmp.write_text(install_hash)
+    os.replace(tmp, sentinel)
 
-    # Install dependencies using conanfile.txt
-    cmd = [
-        "conan",
-        "install",
-        ".",
-        "--output-folder",
-        str(conan_dir),
-        "--build",
-        "missing",
-        "-s",
-        "os=Android",
-        "-s",
-        f"arch={arch}",
-        "-s",
-        "compiler=clang",
-        "-s",
-        "compiler.version=12",
-        "-s",
-        f"compiler.cppstd=17",
-    ]
-    if verbose:
-        cmd.append("--verbose")
+def _clear_install_hash(conan_dir):
+    """
+    @brief Invalidate the stored Conan install fingerprint before installing again.
 
-    result = subprocess.run(cmd, cwd=project_root)
-    if result.returncode != 0:
-        print("Error: Conan installation failed")
-        return False
+    @details An install that fails part-way may already have rewritten the generators,
+    so the previous fingerprint must not survive it.
 
-    # Configure Android project
-    cmd = [
-        "cmake",
-        "-S",
-        ".",
-        "-B",
-        "build/android",
-        f"-DCMAKE_TOOLCHAIN_FILE={android_ndk_home}/build/cmake/android.toolchain.cmake",
-        f"-DANDROID_ABI={android_abi}",
+    @param conan_dir Path Directory for Conan-generated files
+    """
+    try:
+        (conan_dir / ".install_fingerprint").unlink()
+    except FileNotFoundError:
+        pass
+
+def _write_configure_hash(build_dir, cmd_hash):
+    """
+    @brief Store the fingerprint of a successful CMake configure step.
+
+    @param build_dir Path CMake binary directory
+    @param cmd_hash str Fingerprint returned by _configure_hash()
+    """
+    (build_dir / ".configure_hash").write_text(cmd_hash)
+
+def _clear_configure_hash(build_dir):
+    """
+    @brief Invalidate the stored configure fingerprint before configuring again.
+
+    @param build_dir Path CMake binary directory
+    """
+    try:
+        (build_dir / ".configure_hash").unlink()
+    except FileNotFoundError:
+        pass
+
+# Background deletions still running, joined before the interpreter exits
+_cleanup_threads = []
+
+def _join_cleanup_threads():
+    """
+    @brief Wait for all background directory deletions to finish.
+    """
+    for thread in _cleanup_threads:
+        thread.join()
+
+atexit.register(_join_cleanup_threads)
+
+def _async_rmtree(path):
+    """
+    @brief Delete a directory tree in a background thread.
+
+    @param path Path Directory to delete
+    """
+    thread = threading.Thread(target=shutil.rmtree, args=(path, True), daemon=False)
+    thread.start()
+    _cleanup_threads.append(thread)
+
+def _discard_dir(path):
+    """
+    @brief Remove a directory without waiting for the deletion.
+
+    @details The directory is renamed to a unique sibling first, so the original path
+    is free immediately, and the renamed tree is deleted in the background while the
+    build continues. A sibling never crosses volumes, so the rename stays cheap on
+    every platform. If the rename fails (e.g. a file is locked on Windows), the
+    directory is deleted synchronously.
+
+    @param path Path Directory to remove
+    """
+    trash = path.with_name(f"{path.name}.trash.{uuid.uuid4().hex}")
+    try:
+        path.rename(trash)
+    except OSError:
+        shutil.rmtree(path)
+        return
+    _async_rmtree(trash)
+
+@dataclass(frozen=True)
+class PlatformSpec:
+    """
+    @brief Description of how to build the project for one target platform.
+
+    @details user_toolchain and the entries of cmake_args and conan_conf are templates:
+    `{NAME}` placeholders are replaced with the value of the environment variable NAME
+    when the build starts. The platform toolchain (user_toolchain, or arch_toolchains relative to
+    the project root) is included by Conan's toolchain, which stays the only
+    CMAKE_TOOLCHAIN_FILE.
+    """
+    name: str
+    conan_os: str
+    conan_compiler: str
+    compiler_version: str
+    default_arch: str
+    archs: Tuple[str, ...]
+    build_subdir: str = ""
+    generator: Optional[str] = None
+    ninja_requires: Optional[str] = None
+    msvc: bool = False
+    user_toolchain: Optional[str] = None
+    cmake_args: Tuple[str, ...] = ()
+    conan_conf: Tuple[str, ...] = ()
+    arch_args: Mapping[str, Tuple[str, ...]] = field(default_factory=dict, compare=False)
+    arch_toolchains: Mapping[str, str] = field(default_factory=dict, compare=False)
+    vs_platforms: Mapping[str, str] = field(default_factory=dict, compare=False)
+
+WINDOWS_SPEC = PlatformSpec(
+    name="Windows",
+    conan_os="Windows",
+    conan_compiler="msvc",
+    compiler_version="195",
+    default_arch="x86_64",
+    archs=("x86", "x86_64", "armv8"),
+    generator="Visual Studio 18 2026",
+    # Ninja needs the MSVC environment of a developer command prompt (cl.exe on PATH)
+    ninja_requires="cl",
+    msvc=True,
+    # The platform is only selectable for Visual Studio; Ninja uses the prompt's target
+    vs_platforms={"x86": "Win32", "x86_64": "x64", "armv8": "ARM64"},
+)
+
+LINUX_SPEC = PlatformSpec(
+    name="Linux",
+    conan_os="Linux",
+    conan_compiler="gcc",
+    compiler_version="11",
+    default_arch="x86_64",
+    archs=("x86", "x86_64", "armv7", "armv8"),
+    # Cross-compilation settings (if non-x86_64 architecture is specified)
+    arch_args={
+        "x86": ("-DCMAKE_C_FLAGS=-m32", "-DCMAKE_CXX_FLAGS=-m32"),
+    },
+    arch_toolchains={
+        "armv7": "cmake/arm-linux-gnueabihf.cmake",
+        "armv8": "cmake/aarch64-linux-gnu.cmake",
+    },
+)
+
+ANDROID_SPEC = PlatformSpec(
+    name="Android",
+    conan_os="Android",
+    conan_compiler="clang",
+    compiler_version="12",
+    default_arch="armv8",
+    archs=("armv7", "armv8", "x86", "x86_64"),
+    build_subdir="android",
+    # Conan's toolchain includes the NDK's android.toolchain.cmake itself
+    conan_conf=("tools.android:ndk_path={ANDROID_NDK_HOME}",),
+    cmake_args=(
         "-DANDROID_PLATFORM=android-24",
-        f"-DCMAKE_BUILD_TYPE={build_type}",
         "-DHUD_ENGINE_PLATFORM_ANDROID=ON",
         "-DHUD_ENGINE_USE_EGL=ON",
-        f"-DCMAKE_PREFIX_PATH={conan_dir}",
-        f"-DCMAKE_TOOLCHAIN_FILE={conan_dir}/build/generators/conan_toolchain.cmake"
-    ]
-    if verbose:
-        cmd.append("--verbose")
+    ),
+    # Map architecture to Android ABI
+    arch_args={
+        "armv7": ("-DANDROID_ABI=armeabi-v7a",),
+        "armv8": ("-DANDROID_ABI=arm64-v8a",),
+        "x86": ("-DANDROID_ABI=x86",),
+        "x86_64": ("-DANDROID_ABI=x86_64",),
+    },
+)
+
+QNX_SPEC = PlatformSpec(
+    name="QNX",
+    conan_os="Neutrino",
+    conan_compiler="qcc",
+    compiler_version="5.4",
+    default_arch="armv7",
+    archs=("x86", "x86_64", "armv7", "armv8"),
+    build_subdir="qnx",
+    user_toolchain="{QNX_SDP_HOME}/qnx710/cmake/toolchain.cmake",
+    cmake_args=(
+        "-DHUD_ENGINE_PLATFORM_QNX=ON",
+        "-DHUD_ENGINE_USE_EGL=ON",
+    ),
+    # QNX architecture specific configuration
+    arch_args={
+        "x86": ("-DQNX_TARGET_CPU=x86",),
+        "armv7": ("-DQNX_TARGET_CPU=armv7",),
+        "armv8": ("-DQNX_TARGET_CPU=aarch64le",),
+    },
+)
+
+PLATFORM_SPECS = {
+    "windows": WINDOWS_SPEC,
+    "linux": LINUX_SPEC,
+    "android": ANDROID_SPEC,
+    "qnx": QNX_SPEC,
+}
+
+def build_generic(spec, project_root, conan_dir, build_dir, build_types, arch=None, verbose=False):
+    """
+    @brief Build the project for the platform described by spec.
 
-    result = subprocess.run(cmd, cwd=project_root)
-    if result.returncode != 0:
-        print("Error: Android CMake configuration failed")
-        return False
+    @details Installs dependencies using Conan, configures the project with CMake and
+    builds every requested configuration. Ninja Multi-Config is preferred when
+    installed, otherwise the platform's default generator is
+    used. The steps run as a dependency graph: the Conan installs are chained, the
+    CMake capability probe overlaps with them, and configure waits for both.
 
-    # Build Android project
-    cmd = ["cmake", "--build", "build/android", "-j", "4"]
-    if verbose:
-        cmd.append("--verbose")
+    @param spec PlatformSpec Target platform description
+    @param project_root Path Root directory of the project
+    @param conan_dir Path Directory for Conan-generated files
+    @param build_dir Path Directory for build output
+    @param build_types list[str] Build types ('Debug', 'Release', 'RelWithDebInfo')
+    @param arch Optional[str] Target architecture, one of spec.archs
+    @param verbose bool Enable verbose output
+    @return bool True if build succeeded, False otherwise
+    """
+    print(f"Building {spec.name} version...")
 
-    result = subprocess.run(cmd, cwd=project_root)
-    if result.returncode != 0:
-        print("Error: Android build failed")
-        return False
+    if not arch:
+        arch = spec.default_arch
 
-    return True
+    if arch not in spec.archs:
+        print(f"Error: Unsupported {spec.name} architecture: {arch}")
+        return False
 
-def build_for_qnx(project_root, conan_dir, build_dir, build_type, arch=None, verbose=False):
-    """QNX平台构建"""
-    print("构建QNX版本...")
+    # Expand the argv templates once per build
+    try:
+        cmake_args = [arg.format_map(os.environ) for arg in spec.cmake_args]
+        conan_conf = [conf.format_map(os.environ) for conf in spec.conan_conf]
+        user_toolchain = spec.user_toolchain.format_map(os.environ) if spec.user_toolchain else None
+    except KeyError as e:
+        print(f"Error: Please set {e.args[0]} environment variable")
+        return False
+    if arch in spec.arch_toolchains:
+        user_toolchain = str(project_root / spec.arch_toolchains[arch])
+
+    # Conan's toolchain includes the platform toolchain, so only one toolchain file is set
+    toolchain_conf = []
+    if user_toolchain:
+        toolchains = json.dumps([Path(user_toolchain).as_posix()])
+        toolchain_conf = ["-c", f"tools.cmake.cmaketoolchain:user_toolchain={toolchains}"]
+
+    cmake_build_dir = build_dir / spec.build_subdir if spec.build_subdir else build_dir
+    cmake_build_dir.mkdir(exist_ok=True)
+    cmake_build_path = Path("build", spec.build_subdir).as_posix()
+
+    generator = spec.generator
+    if not spec.ninja_requires or shutil.which(spec.ninja_requires):
+        generator = _select_generator(generator)
+    if len(build_types) > 1 and not _is_multi_config(generator):
+        print("Error: Building several build types at once requires Ninja")
+        return False
 
-    qnx_sdp_home = os.environ.get("QNX_SDP_HOME")
-    qnx_build_dir = build_dir / "qnx"
-    qnx_build_dir.mkdir(exist_ok=True)
+    # Install dependencies using conanfile.txt
+    profile = _write_profile(conan_dir / "profiles" / f"{spec.name.lower()}-{arch}.profile", {
+        "os": spec.conan_os,
+        "arch": arch,
+        "compiler": spec.conan_compiler,
+        "compiler.version": spec.compiler_version,
+        "compiler.cppstd": "17",
+    })
+    conan_args = [
+        *_conan_profile_args(profile),
+        *(["-c", f"tools.cmake.cmaketoolchain:generator={generator}"] if generator else []),
+        *toolchain_conf,
+        *(arg for conf in conan_conf for arg in ("-c", conf)),
+    ]
 
-    if not arch:
-        arch = "armv7"
+    # Resolve the dependency graph once, with the same profiles and confs as the installs
+    lockfile = _create_conan_lockfile(
+        project_root, conan_dir, profile, conan_args, build_types[0], verbose
+    )
+    if not lockfile:
+        return False
 
-    # Install dependencies using conanfile.txt
     cmd = [
         "conan",
         "install",
@@ -429,143 +1029,184 @@ def build_for_qnx(project_root, conan_dir, build_dir, build_type, arch=None, ver
         str(conan_dir),
         "--build",
         "missing",
-        "-s",
-        "os=Neutrino",
-        "-s",
-        f"arch={arch}",
-        "-s",
-        "compiler=qcc",
-        "-s",
-        "compiler.version=5.4",
-        "-s",
-        f"compiler.cppstd=17",
+        *conan_args,
+        "--lockfile",
+        str(lockfile),
+        *(["--verbose"] if verbose else []),
     ]
-    if verbose:
-        cmd.append("--verbose")
 
-    result = subprocess.run(cmd, cwd=project_root)
-    if result.returncode != 0:
-        print("Error: Conan installation failed")
-        return False
+    toolchain = _conan_toolchain(conan_dir, generator, build_types[0])
 
-    # Configure QNX project
-    cmd = [
+    # Compiler cache; MSVC's separate PDB files defeat caching, so embed debug info.
+    # Visual Studio generators ignore compiler launchers, so neither is set for them.
+    use_vs_platform = bool(generator) and generator.startswith("Visual Studio")
+    launcher = None if use_vs_platform else _detect_launcher(prefer_sccache=spec.msvc)
+
+    # Configure CMake project
+    configure_cmd = [
         "cmake",
         "-S",
         ".",
         "-B",
-        "build/qnx",
-        f"-DCMAKE_TOOLCHAIN_FILE={qnx_sdp_home}/qnx710/cmake/toolchain.cmake",
-        f"-DCMAKE_BUILD_TYPE={build_type}",
-        "-DHUD_ENGINE_PLATFORM_QNX=ON",
-        "-DHUD_ENGINE_USE_EGL=ON",
+        cmake_build_path,
+        *(["-G", generator] if generator else []),
+        *cmake_args,
         f"-DCMAKE_PREFIX_PATH={conan_dir}",
-        f"-DCMAKE_TOOLCHAIN_FILE={conan_dir}/build/generators/conan_toolchain.cmake"
+        f"-DCMAKE_TOOLCHAIN_FILE={toolchain}",
+        *_build_type_args(generator, build_types),
+        *spec.arch_args.get(arch, ()),
+        *(["-A", spec.vs_platforms[arch]] if use_vs_platform and arch in spec.vs_platforms else []),
+        *_launcher_args(launcher),
+        *(["-DCMAKE_MSVC_DEBUG_INFORMATION_FORMAT=Embedded"] if spec.msvc and launcher else []),
+        *(["--verbose"] if verbose else []),
     ]
 
-    # Set QNX architecture specific configuration
-    if arch == "x86":
-        cmd.extend(["-DQNX_TARGET_CPU=x86"])
-    elif arch == "armv7":
-        cmd.extend(["-DQNX_TARGET_CPU=armv7"])
-    elif arch == "armv8":
-        cmd.extend(["-DQNX_TARGET_CPU=aarch64le"])
-
-    if verbose:
-        cmd.append("--verbose")
-
-    result = subprocess.run(cmd, cwd=project_root)
-    if result.returncode != 0:
-        print("Error: QNX CMake configuration failed")
-        return False
-
-    # Build QNX project
-    cmd = ["cmake", "--build", "build/qnx", "-j", "4"]
-    if verbose:
-        cmd.append("--verbose")
-
-    result = subprocess.run(cmd, cwd=project_root)
-    if result.returncode != 0:
-        print("Error: QNX build failed")
-        return False
+    def configure():
+        cmd_hash = _configure_hash(project_root, configure_cmd)
+        if not _needs_reconfigure(cmake_build_dir, cmd_hash):
+            print("CMake configuration is up to date, skipping configure step")
+            return True
+        # A configure that fails part-way may already have written CMakeCache.txt
+        _clear_configure_hash(cmake_build_dir)
+        if _run_streaming(configure_cmd, project_root, _ABORT_MARKERS) != 0:
+            return False
+        _write_configure_hash(cmake_build_dir, cmd_hash)
+        return True
+
+    def probe():
+        capabilities = _run_buffered(["cmake", "-E", "capabilities"], project_root)
+        return _check_capabilities(capabilities, generator)
+
+    # Conan installs run one after another, the CMake probe overlaps with them,
+    # and the configure step waits for both. The installs are skipped entirely
+    # when conanfile.txt, the profiles and the install commands are unchanged.
+    conan_cmds = _conan_install_cmds(cmd, build_types)
+    install_hash = _install_hash(project_root, profile, conan_cmds)
+    tasks = [Task("cmake_probe", probe, project_root, [])]
+    configure_deps = ["cmake_probe"]
+    if _needs_install(conan_dir, install_hash, toolchain):
+        _clear_install_hash(conan_dir)
+
+        def record_install():
+            _write_install_hash(conan_dir, install_hash)
+            return True
+
+        install_deps = []
+        for index, conan_cmd in enumerate(conan_cmds):
+            name = f"conan_install_{index}"
+            tasks.append(Task(name, conan_cmd, project_root, install_deps, _ABORT_MARKERS))
+            install_deps = [name]
+        tasks.append(Task("conan_fingerprint", record_install, project_root, install_deps))
+        configure_deps.append("conan_fingerprint")
+    else:
+        print("Conan dependencies are up to date, skipping conan install")
+    tasks.append(Task("cmake_configure", configure, project_root, configure_deps))
+
+    # Build project, one configuration at a time
+    previous = "cmake_configure"
+    for build_type in build_types:
+        name = f"cmake_build_{build_type}"
+        build_cmd = [
+            "cmake",
+            "--build",
+            cmake_build_path,
+            "--config",
+            build_type,
+            *_parallel_args(generator),
+            *(["--verbose"] if verbose else []),
+        ]
+        tasks.append(Task(name, build_cmd, project_root, [previous]))
+        previous = name
+
+    results = _run_tasks(tasks)
+    for task in tasks:
+        if results[task.name] not in (0, None):
+            if task.name.startswith("conan_install"):
+                print("Error: Conan installation failed")
+            elif task.name == "cmake_configure":
+                print(f"Error: {spec.name} CMake configuration failed")
+            elif task.name.startswith("cmake_build"):
+                print(f"Error: {spec.name} build failed")
+            return False
 
     return True
 
-def build_project(target_platform=None, arch=None, clean=False, verbose=False, build_type="Release"):
+def build_project(target_platform=None, arch=None, clean=False, verbose=False, build_types=("Release",),
+                  conan_home=None):
     """
     @brief Main build function that orchestrates the entire build process.
 
     @details This is the main entry point for building the project. It handles platform
-    detection, directory setup, dependency installation, and delegates to platform-specific
-    build functions.
+    detection, directory setup, dependency installation, and delegates to build_generic()
+    with the specification of the target platform.
 
     @param target_platform Optional[str] Target platform ('windows', 'linux', 'android', 'qnx')
     @param arch Optional[str] Target architecture
     @param clean bool Clean build directories before building
     @param verbose bool Enable verbose output
-    @param build_type str Build type ('Debug', 'Release', 'RelWithDebInfo')
+    @param build_types Sequence[str] Build types ('Debug', 'Release', 'RelWithDebInfo')
+    @param conan_home Optional[str] Conan package cache (default: $CONAN_HOME or ~/.conan2)
     @return bool True if build succeeded, False otherwise
     """
     project_root = Path(__file__).parent.absolute()
     build_dir = project_root / "build"
     conan_dir = project_root / "conan"
 
+    # The package cache lives outside the workspace so it is shared across projects
+    # and branches and can be cached by CI; conan_dir only holds generated files
+    if conan_home:
+        os.environ["CONAN_HOME"] = str(Path(conan_home).absolute())
+    else:
+        os.environ.setdefault("CONAN_HOME", str(Path.home() / ".conan2"))
+
     if not target_platform:
         target_platform = detect_platform()
 
+    spec = PLATFORM_SPECS.get(target_platform)
+    if not spec:
+        print(f"Error: Unsupported platform: {target_platform}")
+        return False
+
     if not arch:
-        if target_platform == "windows":
-            arch = "x86_64"
-        elif target_platform == "linux":
-            arch = "x86_64"
-        elif target_platform == "android":
-            arch = "armv8"
-        elif target_platform == "qnx":
-            arch = "armv7"
+        arch = spec.default_arch
+
+    # Repeated build types would configure and build the same configuration twice
+    build_types = list(dict.fromkeys(build_types))
 
     print("=" * 60)
     print("3D HUD Rendering Engine - Cross-Platform Build Script")
     print("=" * 60)
     print(f"Target platform: {target_platform}")
     print(f"Target architecture: {arch}")
-    print(f"Build type: {build_type}")
+    print(f"Build type: {', '.join(build_types)}")
     print(f"Build directory: {build_dir}")
     print(f"Conan directory: {conan_dir}")
+    print(f"Conan home: {os.environ['CONAN_HOME']}")
     print("-" * 60)
 
     # Clean old build
     if clean:
-        import shutil
         if build_dir.exists():
-            shutil.rmtree(build_dir)
+            _discard_dir(build_dir)
             print("Cleaned old build directory")
         if conan_dir.exists():
-            shutil.rmtree(conan_dir)
+            _discard_dir(conan_dir)
             print("Cleaned old Conan directory")
-    
+
     build_dir.mkdir(exist_ok=True)
     conan_dir.mkdir(exist_ok=True)
 
+    # Keep the compiler caches next to the Conan state so CI can cache them together;
+    # ccache and sccache use different layouts and evict independently, so they
+    # get separate directories
+    cache_dir = conan_dir.parent / ".ccache"
+    os.environ.setdefault("CCACHE_DIR", str(cache_dir / "ccache"))
+    os.environ.setdefault("SCCACHE_DIR", str(cache_dir / "sccache"))
+
     # Platform-specific build
-    if target_platform == "windows":
-        success = build_for_windows(
-            project_root, conan_dir, build_dir, build_type, arch, verbose
-        )
-    elif target_platform == "linux":
-        success = build_for_linux(
-            project_root, conan_dir, build_dir, build_type, arch, verbose
-        )
-    elif target_platform == "android":
-        success = build_for_android(
-            project_root, conan_dir, build_dir, build_type, arch, verbose
-        )
-    elif target_platform == "qnx":
-        success = build_for_qnx(
-            project_root, conan_dir, build_dir, build_type, arch, verbose
-        )
-    else:
-        print(f"Error: Unsupported platform: {target_platform}")
-        return False
+    success = build_generic(
+        spec, project_root, conan_dir, build_dir, build_types, arch, verbose
+    )
 
     if success:
         print("\n" + "=" * 60)
@@ -599,9 +1240,15 @@ def main():
     )
     parser.add_argument(
         "--build-type",
+        dest="build_types",
+        nargs="+",
         choices=["Debug", "Release", "RelWithDebInfo"],
-        default="Release",
-        help="Build type",
+        default=["Release"],
+        help="Build type(s); several types share one Conan graph and CMake configure",
+    )
+    parser.add_argument(
+        "--conan-home",
+        help="Conan package cache directory (default: $CONAN_HOME or ~/.conan2)",
     )
     parser.add_argument("--verbose", "-v", action="store_true", help="Verbose output")
     parser.add_argument("--clean", action="store_true", help="Clean build")
@@ -616,7 +1263,8 @@ def main():
         arch=args.arch,
         clean=args.clean,
         verbose=args.verbose,
-        build_type=args.build_type,
+        build_types=args.build_types,
+        conan_home=args.conan_home,
     )
 
     sys.exit(0 if success else 1)